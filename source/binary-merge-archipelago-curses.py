@@ -0,0 +1,178 @@
+import curses
+import sys
+import os
+
+from binary_merge_engine import GameBinaryMerge
+
+# Layout
+CELL_WIDTH = 8
+GRID_TOP = 4
+GRID_LEFT = 2
+
+# Tile colors, by power of two (curses color pair number, foreground, background)
+TILE_COLOR_PAIRS = [
+    (1, curses.COLOR_WHITE, -1),     # 2, 4
+    (2, curses.COLOR_YELLOW, -1),    # 8 - 64
+    (3, curses.COLOR_RED, -1),       # 128 - 2048
+    (4, curses.COLOR_MAGENTA, -1)    # 4096 and up
+]
+
+
+class GameCurses:
+    def __init__(self, screen):
+        self.screen = screen
+        self.game = GameBinaryMerge()
+        self.show_debug = False
+        self.use_colors = False
+
+        # Text currently on screen at each position, so unchanged text is never repainted
+        self.drawn = {}
+        self.drawn_size = None
+
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            # Some terminals can't hide the cursor
+            pass
+        self.screen.keypad(True)
+        if curses.has_colors():
+            try:
+                curses.start_color()
+                curses.use_default_colors()
+                for pair, foreground, background in TILE_COLOR_PAIRS:
+                    curses.init_pair(pair, foreground, background)
+                self.use_colors = True
+            except curses.error:
+                # Terminal can't do (default) colors, fall back to bold/dim tiles
+                self.use_colors = False
+
+    def put(self, y, x, text, attr=0):
+        if self.drawn.get((y, x)) == (text, attr):
+            return
+        self.drawn[(y, x)] = (text, attr)
+        try:
+            self.screen.addstr(y, x, text, attr)
+        except curses.error:
+            # Terminal too small, skip what doesn't fit
+            pass
+
+    def tile_attr(self, value):
+        if value == 0:
+            return curses.A_DIM
+        if not self.use_colors:
+            return curses.A_BOLD
+        power = value.bit_length() - 1
+        if power <= 2:
+            pair = 1
+        elif power <= 6:
+            pair = 2
+        elif power <= 11:
+            pair = 3
+        else:
+            pair = 4
+        return curses.color_pair(pair) | curses.A_BOLD
+
+    def draw(self):
+        # A grid resize (or reset back to 2x2) moves everything below the board
+        size = (self.game.rows, self.game.cols)
+        if size != self.drawn_size:
+            self.screen.erase()
+            self.drawn = {}
+            self.drawn_size = size
+
+        self.put(0, GRID_LEFT, "Binary Merge: Archipelago Edition", curses.A_BOLD)
+        self.put(2, GRID_LEFT, f"SCORE {self.game.score:<8} BEST {self.game.best_score:<8} "
+                               f"MOVES {self.game.moves:<6} CHECKS {self.game.archipelago_checks:<4}")
+
+        # Board
+        for i in range(self.game.rows):
+            for j in range(self.game.cols):
+                value = self.game.grid[i][j]
+                text = str(value) if value else "."
+                self.put(GRID_TOP + i, GRID_LEFT + j * CELL_WIDTH, text.rjust(CELL_WIDTH - 1) + " ", self.tile_attr(value))
+
+        y = GRID_TOP + self.game.rows + 1
+        self.put(y, GRID_LEFT, f"Next tile in: {self.game.moves_before_spawn - self.game.moves_since_last_spawn} moves ")
+        self.put(y + 1, GRID_LEFT, "Arrows: move  Space: skip turn  N: new game  D: debug  Q: quit")
+
+        # Rewards
+        self.put(y + 3, GRID_LEFT, "Archipelago Rewards", curses.A_BOLD)
+        rewards = [
+            (f"1: Add Row ({self.game.rows}/{self.game.max_rows})", self.game.rows >= self.game.max_rows),
+            (f"2: Add Column ({self.game.cols}/{self.game.max_cols})", self.game.cols >= self.game.max_cols),
+            (f"3: Reduce Spawn Moves ({self.game.moves_before_spawn})", self.game.rewards["delay_spawn_moves"])
+        ]
+        for offset, (text, claimed) in enumerate(rewards):
+            self.put(y + 4 + offset, GRID_LEFT, text.ljust(30), curses.A_DIM if claimed else 0)
+
+        if self.game.game_over:
+            self.put(y + 8, GRID_LEFT, f"Game Over! Final Score: {self.game.score}  Best Score: {self.game.best_score}", curses.A_REVERSE)
+        else:
+            self.put(y + 8, GRID_LEFT, " " * 60)
+
+        # Debug panel, toggled with d
+        debug_lines = []
+        if self.show_debug:
+            debug_lines = [
+                f"Grid size: {self.game.rows}x{self.game.cols}",
+                f"Rewards: {self.game.rewards}",
+                f"Claimed thresholds: {self.game.claimed_thresholds}"
+            ]
+        for offset in range(3):
+            text = debug_lines[offset] if offset < len(debug_lines) else ""
+            self.put(y + 10 + offset, GRID_LEFT, text.ljust(80))
+
+        self.screen.refresh()
+
+    def handle_key(self, key):
+        if key in (ord('q'), ord('Q')):
+            return False
+
+        if key == curses.KEY_RESIZE:
+            self.drawn_size = None
+        elif key in (ord('n'), ord('N')):
+            self.game.reset()
+        elif key in (ord('d'), ord('D')):
+            self.show_debug = not self.show_debug
+        elif not self.game.game_over:
+            if key == curses.KEY_UP:
+                self.game.move('up')
+            elif key == curses.KEY_DOWN:
+                self.game.move('down')
+            elif key == curses.KEY_LEFT:
+                self.game.move('left')
+            elif key == curses.KEY_RIGHT:
+                self.game.move('right')
+            elif key == ord(' '):
+                self.game.skip_turn()
+            elif key == ord('1') and self.game.archipelago_checks > 0 and self.game.rows < self.game.max_rows:
+                if self.game.add_row():
+                    self.game.archipelago_checks -= 1
+            elif key == ord('2') and self.game.archipelago_checks > 0 and self.game.cols < self.game.max_cols:
+                if self.game.add_column():
+                    self.game.archipelago_checks -= 1
+            elif key == ord('3') and self.game.archipelago_checks > 0 and not self.game.rewards["delay_spawn_moves"]:
+                if self.game.delay_spawn_moves():
+                    self.game.archipelago_checks -= 1
+        return True
+
+    def run(self):
+        self.draw()
+        # getch blocks until a key arrives, so an idle board costs no CPU
+        while self.handle_key(self.screen.getch()):
+            self.draw()
+
+
+def main():
+    # The engine logs every move with print, keep that off the terminal
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        curses.wrapper(lambda screen: GameCurses(screen).run())
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,18 @@ import pygame
 import sys
 import random
 import math
+import time
+import os
+import json
+import socket
+import threading
+import argparse
+import gc
+import tracemalloc
 from pygame.locals import *
 
+from binary_merge_engine import GameBinaryMerge, MoveCache, MoveLogExporter
+
 # Initialize pygame
 pygame.init()
 
@@ -20,6 +30,10 @@ BUTTON_HOVER_COLOR = (159, 139, 120)
 REWARD_COLOR = (143, 122, 102)
 REWARD_CLAIMED_COLOR = (118, 100, 84)
 
+# Frame pacing
+FPS = 60
+IDLE_REFRESH_MS = 1000  # Redraw at least this often while idle
+
 # Tile colors
 TILE_COLORS = {
     0: (205, 193, 180),
@@ -71,408 +85,163 @@ TILE_FONT = pygame.font.SysFont('Arial', 36, bold=True)
 BUTTON_FONT = pygame.font.SysFont('Arial', 18, bold=True)
 INFO_FONT = pygame.font.SysFont('Arial', 14)
 
-class GameBinaryMerge:
-    def __init__(self, rows=2, cols=2):
-        self.rows = rows
-        self.cols = cols
-        self.grid = [[0 for _ in range(cols)] for _ in range(rows)]
-        self.score = 0
-        self.best_score = 0
-        self.moves = 0
-        self.moves_before_spawn = 1  # Initial value
-        self.moves_since_last_spawn = 0
-        self.archipelago_checks = 0
-        self.location_thresholds = [4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072]  # Score thresholds for checks
-        self.claimed_thresholds = []
-        self.game_over = False
-        
-        # Define rewards structure
-        self.max_rows = 8
-        self.max_cols = 8
-        self.rewards = {
-            "add_row": False,
-            "add_column": False,
-            "delay_spawn_moves": False
-        }        
-       
-        # Add initial tiles
-        self.add_random_tile()
-        self.add_random_tile()
-    
-    def reset(self):
-        print("Resetting game...")
-        self.rows = 2
-        self.cols = 2
-        
-        # Make sure grid is properly initialized with the right dimensions
-        self.grid = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
-        print(f"Grid reset to {self.rows}x{self.cols}")
-        
-        self.score = 0
-        self.moves = 0
-        self.moves_since_last_spawn = 0
-        self.moves_before_spawn = 3
-        self.archipelago_checks = 0
-        self.claimed_thresholds = []
-        self.game_over = False
-        
-        # Don't reset best_score
-        print(f"Maintaining best score: {self.best_score}")
-        
-        # Reset rewards
-        self.max_rows = 8
-        self.max_cols = 8
-        self.rewards = {
-            "add_row": False,
-            "add_column": False,
-            "delay_spawn_moves": False
-        }
-        
-        # For testing - give player some checks to start with
-        # Comment this out for the real game
-        self.archipelago_checks = 3
-        
-        # Add initial tiles
-        self.add_random_tile()
-        self.add_random_tile()
-        
-        print("Game reset complete")
-    
-    def add_random_tile(self):
-        # Make sure grid is properly initialized
-        if not self.grid or not self.grid[0]:
-            print("Warning: Grid not properly initialized")
-            self.grid = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
-            
-        empty_cells = [(i, j) for i in range(self.rows) for j in range(self.cols) if self.grid[i][j] == 0]
-        if empty_cells:
-            i, j = random.choice(empty_cells)
-            self.grid[i][j] = 2 if random.random() < 0.9 else 4
-            print(f"Added new tile at position ({i}, {j}) with value {self.grid[i][j]}")
-        else:
-            print("No empty cells available for new tile")
-    
-    def add_row(self):
-        if self.rows < self.max_rows:
-            self.grid.append([0 for _ in range(self.cols)])
-            self.rows += 1
-            print(f"Added row, grid now {self.rows}x{self.cols}")
-            return True
-        else:
-            print(f"Can't add row, already at maximum ({self.max_rows})")
-            return False
-    
-    def add_column(self):
-        if self.cols < self.max_cols:
-            for row in self.grid:
-                row.append(0)
-            self.cols += 1
-            print(f"Added column, grid now {self.rows}x{self.cols}")
-            return True
-        else:
-            print(f"Can't add column, already at maximum ({self.max_cols})")
-            return False
-    
-    def delay_spawn_moves(self):
-        if not self.rewards["delay_spawn_moves"]:
-            self.moves_before_spawn += 1
-            self.rewards["delay_spawn_moves"] = True
-            print(f"Reduced spawn moves to {self.moves_before_spawn}")
-            return True
-        return False
-    
-    def check_thresholds(self):
-        for threshold in self.location_thresholds:
-            if threshold not in self.claimed_thresholds and self.score >= threshold:
-                self.archipelago_checks += 1
-                self.claimed_thresholds.append(threshold)
-                print(f"Score threshold {threshold} reached! Checks: {self.archipelago_checks}")
-                
-    # Helper method for debugging
-    def debug_grid(self):
-        print("Current grid state:")
-        for row in self.grid:
-            print(row)
-    
-    def move(self, direction):
-        if self.game_over:
-            return False
-        
-        moved = False
-        
-        # Save the current state for comparison
-        old_grid = [row[:] for row in self.grid]
-        old_score = self.score
-        
-        try:
-            if direction == 'up':
-                moved = self._move_up()
-            elif direction == 'down':
-                moved = self._move_down()
-            elif direction == 'left':
-                moved = self._move_left()
-            elif direction == 'right':
-                moved = self._move_right()
-            
-            # Only count as a move if something changed
-            if moved:
-                self.moves += 1
-                self.moves_since_last_spawn += 1
-                
-                # Print move info
-                print(f"Moved {direction}, score: {self.score}, points gained: {self.score - old_score}")
-                
-                # Check if we need to spawn a new tile
-                if self.moves_since_last_spawn >= self.moves_before_spawn:
-                    self.add_random_tile()
-                    self.moves_since_last_spawn = 0
-                    print(f"New tile spawned after {self.moves_before_spawn} moves")
+
+# Live board stream for spectator overlays.
+# Clients connect over TCP and receive one JSON message per line: a keyframe
+# ("t": "k") with the full board on connect and whenever the grid is resized,
+# then deltas ("t": "d") holding only the changed cells and counters.
+class SpectatorStream:
+    def __init__(self, host="127.0.0.1", port=38300):
+        self.host = host
+        self.port = port
+        self.clients = []
+        self.joining = []
+        self.running = False
+        self.server = None
+
+        # The render thread only drops the latest snapshot here; the encoder
+        # thread picks it up, so intermediate snapshots are coalesced
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pending = None
+        self.last = None
+
+    def start(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind((self.host, self.port))
+        self.server.listen()
+        self.running = True
+
+        threading.Thread(target=self._accept_loop, name="spectator-accept", daemon=True).start()
+        threading.Thread(target=self._encode_loop, name="spectator-encode", daemon=True).start()
+        print(f"Spectator stream listening on {self.host}:{self.port}")
+
+    def close(self):
+        self.running = False
+        self.wakeup.set()
+        if self.server is not None:
+            self.server.close()
+        with self.lock:
+            for client in self.clients + self.joining:
+                client.close()
+            self.clients = []
+            self.joining = []
+
+    def publish(self, game):
+        # Called from the render thread - only take a cheap snapshot
+        snapshot = (
+            game.rows,
+            game.cols,
+            tuple(value for row in game.grid for value in row),
+            game.score,
+            game.best_score,
+            game.moves,
+            game.archipelago_checks,
+            game.game_over
+        )
+        with self.lock:
+            self.pending = snapshot
+        self.wakeup.set()
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                client, address = self.server.accept()
+            except OSError:
+                break
+            client.settimeout(1.0)
+            print(f"Spectator connected from {address[0]}:{address[1]}")
+            with self.lock:
+                self.joining.append(client)
+            self.wakeup.set()
+
+    def _encode_loop(self):
+        while self.running:
+            self.wakeup.wait()
+            self.wakeup.clear()
+
+            with self.lock:
+                snapshot = self.pending
+                self.pending = None
+                joining = self.joining
+                self.joining = []
+
+            if snapshot is not None and snapshot != self.last:
+                if self.last is None or snapshot[:2] != self.last[:2]:
+                    message = self._encode_keyframe(snapshot)
                 else:
-                    print(f"Next tile in {self.moves_before_spawn - self.moves_since_last_spawn} moves")
-                
-                # Check for new score thresholds
-                self.check_thresholds()
-                
-                # Update best score - add explicit debug
-                if self.score > self.best_score:
-                    old_best = self.best_score
-                    self.best_score = self.score
-                    print(f"New best score: {self.best_score} (was {old_best})")
-                
-                # Check if game is over
-                if self._is_grid_full() and not self._moves_available():
-                    self.game_over = True
-                    print("Game over!")
-        
-        except Exception as e:
-            print(f"Error during movement: {e}")
-            import traceback
-            traceback.print_exc()
-            self.debug_grid()
-            # Recover from error - don't crash
-            return False
-            
-        return moved
-    
-    def skip_turn(self):
-        self.add_random_tile()
-        self.moves_since_last_spawn = 0
-        print("Turn skipped, new tile added")
-        return True
-    
-    def _compress(self, grid):
-        try:
-            # Validate grid
-            if not grid or len(grid) == 0 or len(grid[0]) == 0:
-                print("Invalid grid dimensions in _compress")
-                return [[]]
-                
-            # Compress the grid (move all non-zero numbers to the left)
-            width = len(grid[0])
-            height = len(grid)
-            new_grid = []
-            
-            # Manually create the grid instead of using list comprehension
-            for _ in range(height):
-                row = []
-                for _ in range(width):
-                    row.append(0)
-                new_grid.append(row)
-                
-            # Move numbers to the left
-            for i in range(height):
-                pos = 0
-                for j in range(width):
-                    if grid[i][j] != 0:
-                        new_grid[i][pos] = grid[i][j]
-                        pos += 1
-            return new_grid
-            
-        except Exception as e:
-            print(f"Error compressing grid: {e}")
-            # Return original grid to avoid crashes
-            return grid
-    
-    def _merge(self, grid):
-        try:
-            # Merge adjacent equal numbers
-            score_added = 0
-            for i in range(len(grid)):
-                for j in range(len(grid[0])-1):
-                    if grid[i][j] == grid[i][j+1] and grid[i][j] != 0:
-                        grid[i][j] *= 2
-                        grid[i][j+1] = 0
-                        score_added += grid[i][j]
-            return grid, score_added
-        except Exception as e:
-            print(f"Error merging grid: {e}")
-            # Return original grid with 0 score to avoid crashes
-            return grid, 0
-    
-    def _reverse(self, grid):
-        try:
-            # Reverse the grid
-            new_grid = []
-            for i in range(len(grid)):
-                new_grid.append(grid[i][::-1])
-            return new_grid
-        except Exception as e:
-            print(f"Error reversing grid: {e}")
-            # Return original grid to avoid crashes
-            return grid.copy() if hasattr(grid, 'copy') else grid
-    
-    def _transpose(self, grid):
-        # Transpose the grid
-        # Handle empty grid case
-        if not grid or not grid[0]:
-            return []
-            
-        # Handle non-square grid case correctly
-        rows = len(grid)
-        cols = len(grid[0])
-        new_grid = [[0 for _ in range(rows)] for _ in range(cols)]
-        
-        for i in range(rows):
-            for j in range(cols):
-                new_grid[j][i] = grid[i][j]
-                
-        return new_grid
-    
-    def _move_left(self):
-        try:
-            # 1. Compress the grid
-            compressed_grid = self._compress(self.grid)
-            # 2. Merge the cells
-            merged_grid, new_score = self._merge(compressed_grid)
-            # 3. Compress again after merging
-            final_grid = self._compress(merged_grid)
-            
-            # Update the grid and score
-            changed = final_grid != self.grid
-            if changed:
-                self.grid = final_grid
-                if new_score > self.score:
-                    self.score = new_score
-            
-            return changed
-        except Exception as e:
-            print(f"Error in _move_left: {e}")
-            print(f"Grid dimensions: {len(self.grid)}x{len(self.grid[0]) if self.grid else 0}")
-            return False
-    
-    def _move_right(self):
-        try:
-            # 1. Reverse the grid
-            reversed_grid = self._reverse(self.grid)
-            # 2. Move left
-            compressed_grid = self._compress(reversed_grid)
-            merged_grid, new_score = self._merge(compressed_grid)
-            final_reversed_grid = self._compress(merged_grid)
-            # 3. Reverse back
-            final_grid = self._reverse(final_reversed_grid)
-            
-            # Update the grid and score
-            changed = final_grid != self.grid
-            if changed:
-                self.grid = final_grid
-                if new_score > self.score:
-                    self.score = new_score
-            
-            return changed
-        except Exception as e:
-            print(f"Error in _move_right: {e}")
-            print(f"Grid dimensions: {len(self.grid)}x{len(self.grid[0]) if self.grid else 0}")
-            return False
-    
-    def _move_up(self):
-        try:
-            # 1. Transpose the grid
-            transposed_grid = self._transpose(self.grid)
-            print(f"Transposed grid: {len(transposed_grid)}x{len(transposed_grid[0]) if transposed_grid else 0}")
-            
-            # 2. Move left
-            compressed_grid = self._compress(transposed_grid)
-            merged_grid, new_score = self._merge(compressed_grid)
-            final_transposed_grid = self._compress(merged_grid)
-            
-            # 3. Transpose back
-            final_grid = self._transpose(final_transposed_grid)
-            print(f"Final grid: {len(final_grid)}x{len(final_grid[0]) if final_grid else 0}")
-            
-            # Update the grid and score
-            changed = final_grid != self.grid
-            if changed:
-                self.grid = final_grid
-                if new_score > self.score:
-                    self.score = new_score
-            
-            return changed
-        except Exception as e:
-            print(f"Error in _move_up: {e}")
-            print(f"Grid dimensions: {len(self.grid)}x{len(self.grid[0]) if self.grid else 0}")
-            return False
-    
-    def _move_down(self):
-        try:
-            # 1. Transpose the grid
-            transposed_grid = self._transpose(self.grid)
-            
-            # 2. Move right
-            reversed_grid = self._reverse(transposed_grid)
-            compressed_grid = self._compress(reversed_grid)
-            merged_grid, new_score = self._merge(compressed_grid)
-            final_reversed_grid = self._compress(merged_grid)
-            final_transposed_grid = self._reverse(final_reversed_grid)
-            
-            # 3. Transpose back
-            final_grid = self._transpose(final_transposed_grid)
-            
-            # Update the grid and score
-            changed = final_grid != self.grid
-            if changed:
-                self.grid = final_grid
-                if new_score > self.score:
-                    self.score = new_score
-            
-            return changed
-        except Exception as e:
-            print(f"Error in _move_down: {e}")
-            print(f"Grid dimensions: {len(self.grid)}x{len(self.grid[0]) if self.grid else 0}")
-            return False
-    
-    def _is_grid_full(self):
-        try:
-            for row in self.grid:
-                if 0 in row:
-                    return False
-            return True
-        except Exception as e:
-            print(f"Error checking if grid is full: {e}")
-            return False
-    
-    def _moves_available(self):
-        try:
-            # Check if there are any possible moves
-            for i in range(self.rows):
-                for j in range(self.cols):
-                    if self.grid[i][j] == 0:
-                        return True
-                    
-                    # Check adjacent cells
-                    for di, dj in [(0, 1), (1, 0)]:
-                        ni, nj = i + di, j + dj
-                        if 0 <= ni < self.rows and 0 <= nj < self.cols:
-                            if self.grid[i][j] == self.grid[ni][nj]:
-                                return True
-            return False
-        except Exception as e:
-            print(f"Error checking if moves are available: {e}")
-            return True  # Assume moves are available if there's an error
+                    message = self._encode_delta(self.last, snapshot)
+                self.last = snapshot
+
+                # One encoded message is shared by every viewer
+                with self.lock:
+                    clients = list(self.clients)
+                dead = self._send(clients, message)
+                if dead:
+                    with self.lock:
+                        self.clients = [client for client in self.clients if client not in dead]
+
+            if joining and self.last is not None:
+                dead = self._send(joining, self._encode_keyframe(self.last))
+                joining = [client for client in joining if client not in dead]
+            with self.lock:
+                if self.running:
+                    self.clients.extend(joining)
+                else:
+                    for client in joining:
+                        client.close()
+
+    def _send(self, clients, message):
+        # Returns the clients that have gone away, closed; the caller drops them
+        dead = []
+        for client in clients:
+            try:
+                client.sendall(message)
+            except OSError:
+                print("Spectator disconnected")
+                client.close()
+                dead.append(client)
+        return dead
+
+    def _encode_keyframe(self, snapshot):
+        rows, cols, cells, score, best, moves, checks, game_over = snapshot
+        return self._encode({
+            "t": "k",
+            "r": rows,
+            "c": cols,
+            "g": cells,
+            "s": score,
+            "b": best,
+            "m": moves,
+            "x": checks,
+            "o": game_over
+        })
+
+    def _encode_delta(self, old, new):
+        # Changed cells are sent as a flat [index, value, index, value, ...] list
+        changed = []
+        for index, (before, after) in enumerate(zip(old[2], new[2])):
+            if before != after:
+                changed.append(index)
+                changed.append(after)
+
+        message = {"t": "d"}
+        if changed:
+            message["g"] = changed
+        for position, key in ((3, "s"), (4, "b"), (5, "m"), (6, "x"), (7, "o")):
+            if old[position] != new[position]:
+                message[key] = new[position]
+        return self._encode(message)
+
+    def _encode(self, message):
+        return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
 
 
 class GameUI:
-    def __init__(self):
-        self.game = GameBinaryMerge()
+    def __init__(self, spectator=None, move_cache=None, move_log=None):
+        self.game = GameBinaryMerge(move_cache=move_cache, move_log=move_log)
+        self.spectator = spectator
         self.screen_width = 1200
         self.screen_height = 1000
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
@@ -492,6 +261,10 @@ class GameUI:
             "add_column": pygame.Rect(670, 840, 150, 40),
             "delay_spawn_moves": pygame.Rect(840, 840, 180, 40)
         }
+        
+        # Frame stats, shown with the debug key
+        self.frames_drawn = 0
+        self.last_input_latency = 0.0
     
     def draw_tile(self, x, y, value):
         # Calculate pixel positions using the offset
@@ -682,8 +455,19 @@ class GameUI:
         # Update the display
         pygame.display.flip()
     
+    def hover_state(self):
+        mouse_pos = pygame.mouse.get_pos()
+        return (
+            self.new_game_button.collidepoint(mouse_pos),
+            self.skip_turn_button.collidepoint(mouse_pos)
+        )
+    
     def handle_event(self, event):
         if event.type == QUIT:
+            if self.spectator is not None:
+                self.spectator.close()
+            if self.game.move_log is not None:
+                self.game.move_log.close()
             pygame.quit()
             sys.exit()
         
@@ -722,6 +506,9 @@ class GameUI:
                     print(f"Rewards: {self.game.rewards}")
                     print(f"Checks: {self.game.archipelago_checks}")
                     print(f"Claimed thresholds: {self.game.claimed_thresholds}")
+                    print(f"Frames drawn: {self.frames_drawn}, last input-to-frame: {self.last_input_latency * 1000:.1f} ms")
+                    if self.game.move_cache is not None:
+                        print(self.game.move_cache.stats())
                     self.game.debug_grid()
         
         elif event.type == MOUSEBUTTONDOWN:
@@ -768,12 +555,235 @@ class GameUI:
         print(f"Maximum grid size: {self.game.max_rows}x{self.game.max_cols}")
         print(f"Initial checks: {self.game.archipelago_checks}")
         
+        if self.spectator is not None:
+            self.spectator.publish(self.game)
+        
+        last_hover = None
+        redraw = True
         while True:
-            for event in pygame.event.get():
+            events = pygame.event.get()
+            if not events and not redraw:
+                # Nothing is changing - sleep until input arrives instead of redrawing a static board
+                event = pygame.event.wait(IDLE_REFRESH_MS)
+                if event.type == NOEVENT:
+                    redraw = True  # Periodic refresh
+                else:
+                    events = [event] + pygame.event.get()
+            
+            input_time = time.perf_counter()
+            for event in events:
                 self.handle_event(event)
+                # Mouse movement only matters if it changes a button's hover state
+                if event.type != MOUSEMOTION:
+                    redraw = True
+            
+            hover = self.hover_state()
+            if hover != last_hover:
+                last_hover = hover
+                redraw = True
+            
+            # Hand the new state to the spectator stream, it encodes on its own thread
+            if events and self.spectator is not None:
+                self.spectator.publish(self.game)
             
-            self.draw()
-            clock.tick(60)
+            if redraw:
+                self.draw()
+                self.frames_drawn += 1
+                if events:
+                    self.last_input_latency = time.perf_counter() - input_time
+                redraw = False
+                # Full frame rate only while something is changing
+                clock.tick(FPS)
+
+
+# Long-running leak check for GameUI and the engine.
+# Drives GameUI under the SDL dummy driver with random or scripted input at an
+# uncapped frame rate, samples tracemalloc and RSS, and fails if memory keeps
+# growing after warm-up.
+class SoakHarness:
+    ACTION_KEYS = {
+        "up": K_UP,
+        "down": K_DOWN,
+        "left": K_LEFT,
+        "right": K_RIGHT,
+        "skip": K_SPACE,
+        "add_row": K_1,
+        "add_column": K_2,
+        "delay_spawn_moves": K_3
+    }
+    # Same action names as GameBinaryMerge.apply_moves, plus "reset" for the New Game button
+    ACTIONS = list(ACTION_KEYS) + ["reset"]
+    RANDOM_ACTIONS = ["up", "down", "left", "right"] * 5 + ["skip", "add_row", "add_column", "delay_spawn_moves", "reset"]
+    
+    def __init__(self, frames=200000, sample_every=5000, script=None, seed=None,
+                 max_growth=64 * 1024, max_rss_growth=1024 * 1024,
+                 max_growth_per_games=512 * 1024, max_rss_growth_per_games=4 * 1024 * 1024,
+                 move_cache=None, move_log=None, spectator=None):
+        self.frames = frames
+        self.sample_every = sample_every
+        self.script = script
+        self.random = random.Random(seed)
+        # Allowed growth in bytes per 10k frames and per 10k games. RSS also covers
+        # memory held on pygame's C side (Surfaces, fonts), which tracemalloc can't see
+        self.max_growth = max_growth
+        self.max_rss_growth = max_rss_growth
+        self.max_growth_per_games = max_growth_per_games
+        self.max_rss_growth_per_games = max_rss_growth_per_games
+        # Optional extras from the command line, exercised like in a normal game
+        self.move_cache = move_cache
+        self.move_log = move_log
+        self.spectator = spectator
+        self.samples = []  # (frame, games, traced bytes, rss bytes, warming up)
+        self.cache_was_full = False
+        self.games = 0
+    
+    def run(self):
+        # Swap the display over to the dummy driver so no window is needed
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.display.quit()
+        pygame.display.init()
+        
+        stdout = sys.stdout
+        baseline = None
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        
+        # The game prints on every move, keep that out of the report
+        with open(os.devnull, "w") as devnull:
+            sys.stdout = devnull
+            try:
+                ui = GameUI(spectator=self.spectator, move_cache=self.move_cache, move_log=self.move_log)
+                for frame in range(1, self.frames + 1):
+                    self.step(ui, frame)
+                    if self.spectator is not None:
+                        self.spectator.publish(ui.game)
+                    ui.draw()
+                    
+                    if frame % self.sample_every == 0:
+                        self.sample(frame)
+                        if baseline is None and not self.samples[-1][4]:
+                            baseline = tracemalloc.take_snapshot()
+            finally:
+                if self.spectator is not None:
+                    self.spectator.close()
+                if self.move_log is not None:
+                    self.move_log.close()
+                sys.stdout = stdout
+        
+        elapsed = time.perf_counter() - start_time
+        final = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        
+        return self.report(elapsed, baseline, final)
+    
+    def step(self, ui, frame):
+        if self.script:
+            action = self.script[(frame - 1) % len(self.script)]
+        else:
+            action = self.random.choice(self.RANDOM_ACTIONS)
+        
+        if action == "reset" or ui.game.game_over:
+            # Same path as the New Game button
+            ui.game.reset()
+            self.games += 1
+        else:
+            ui.handle_event(pygame.event.Event(KEYDOWN, key=self.ACTION_KEYS[action]))
+        
+        ui.handle_event(pygame.event.Event(MOUSEMOTION, pos=(frame % ui.screen_width, 900), rel=(1, 0), buttons=(0, 0, 0)))
+    
+    def sample(self, frame):
+        # The exporter's column buffers are bounded by its chunk size, flush them
+        # so they don't show up as growth between samples
+        if self.move_log is not None:
+            self.move_log.flush()
+        
+        # Fonts and caches are still warming up at the first sample. The move cache
+        # keeps growing until it is full, and the allocator takes one more sample
+        # interval to settle once evictions start, so wait for it to have been full
+        # at the previous sample as well
+        cache_full = self.move_cache is None or self.move_cache.full
+        warming_up = not self.samples or not (cache_full and self.cache_was_full)
+        self.cache_was_full = cache_full
+        
+        gc.collect()
+        traced, _ = tracemalloc.get_traced_memory()
+        self.samples.append((frame, self.games, traced, self.rss(), warming_up))
+    
+    def rss(self):
+        # Resident set size in bytes, from /proc where available
+        try:
+            with open("/proc/self/statm") as statm:
+                return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, AttributeError):
+            import resource
+            usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return usage if sys.platform == "darwin" else usage * 1024
+    
+    def slope(self, xs, ys):
+        # Least squares slope of ys against xs
+        n = len(xs)
+        mean_x = sum(xs) / n
+        mean_y = sum(ys) / n
+        variance = sum((x - mean_x) ** 2 for x in xs)
+        if variance == 0:
+            return 0.0
+        return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+    
+    def report(self, elapsed, baseline, final):
+        print(f"Soak: {self.frames} frames, {self.games} games in {elapsed:.1f}s ({self.frames / elapsed:.0f} fps)")
+        if self.move_cache is not None:
+            print(self.move_cache.stats())
+        
+        # Measure the trend over the second half of the samples after warm-up.
+        # RSS can step up once while the allocator settles into steady churn
+        # (evicting cache entries, for one), and a single step early on would
+        # otherwise dominate the fitted slope
+        samples = [sample for sample in self.samples if not sample[4]]
+        samples = samples[len(samples) // 2:]
+        if len(samples) < 3:
+            if self.move_cache is not None and not self.move_cache.full:
+                print("Soak: move cache never filled up, run more frames or use a smaller --move-cache")
+            print("Soak: not enough samples after warm-up to measure growth, run more frames")
+            return False
+        
+        frames = [sample[0] for sample in samples]
+        games = [sample[1] for sample in samples]
+        traced = [sample[2] for sample in samples]
+        rss = [sample[3] for sample in samples]
+        
+        traced_per_frames = self.slope(frames, traced) * 10000
+        rss_per_frames = self.slope(frames, rss) * 10000
+        print(f"Traced memory: {traced[0] / 1024:.0f} KiB -> {traced[-1] / 1024:.0f} KiB, {traced_per_frames / 1024:+.1f} KiB per 10k frames")
+        print(f"RSS: {rss[0] / 1048576:.1f} MiB -> {rss[-1] / 1048576:.1f} MiB, {rss_per_frames / 1024:+.1f} KiB per 10k frames")
+        
+        # (what, growth, limit) for every enforced slope
+        checks = [
+            ("traced memory per 10k frames", traced_per_frames, self.max_growth),
+            ("RSS per 10k frames", rss_per_frames, self.max_rss_growth)
+        ]
+        if games[-1] > games[0]:
+            traced_per_games = self.slope(games, traced) * 10000
+            rss_per_games = self.slope(games, rss) * 10000
+            print(f"Per 10k games: traced {traced_per_games / 1024:+.1f} KiB, RSS {rss_per_games / 1024:+.1f} KiB")
+            checks.append(("traced memory per 10k games", traced_per_games, self.max_growth_per_games))
+            checks.append(("RSS per 10k games", rss_per_games, self.max_rss_growth_per_games))
+        else:
+            print("Per 10k games: no games finished between samples")
+        
+        if baseline is not None:
+            print("Top allocation growth since warm-up:")
+            for stat in final.compare_to(baseline, "lineno")[:5]:
+                print(f"  {stat}")
+        
+        passed = True
+        for what, growth, limit in checks:
+            if growth > limit:
+                print(f"Soak FAILED: {what} grows {growth / 1024:.1f} KiB (limit {limit / 1024:.1f} KiB)")
+                passed = False
+        
+        if passed:
+            print("Soak passed")
+        return passed
 
 
 # This is a placeholder for the Archipelago integration
@@ -800,8 +810,45 @@ class ArchipelagoClient:
 
 # Main function to run the game
 def main():
+    parser = argparse.ArgumentParser(description="Binary Merge: Archipelago Edition")
+    parser.add_argument("--spectate-port", type=int, default=None,
+                        help="Stream board changes to spectator overlays on this local port")
+    parser.add_argument("--move-cache", type=int, default=0, metavar="ENTRIES",
+                        help="Cache move results for up to this many board positions in total (half raw boards, half symmetry-reduced)")
+    parser.add_argument("--export-moves", default=None, metavar="DIRECTORY",
+                        help="Write per-move records as columnar chunks (memory-mappable .npy per column) to this directory")
+    parser.add_argument("--compress-moves", action="store_true",
+                        help="Write exported move chunks as compressed .npz archives instead")
+    parser.add_argument("--soak", type=int, default=None, metavar="FRAMES",
+                        help="Run the memory soak test for this many frames under the dummy video driver")
+    parser.add_argument("--soak-script", default=None, metavar="ACTIONS",
+                        help=f"Comma-separated actions to cycle through in the soak test instead of random input ({', '.join(SoakHarness.ACTIONS)})")
+    parser.add_argument("--soak-seed", type=int, default=None,
+                        help="Random seed for the soak test input")
+    args = parser.parse_args()
+    
+    script = args.soak_script.split(",") if args.soak_script else None
+    if script:
+        unknown = [action for action in script if action not in SoakHarness.ACTIONS]
+        if unknown:
+            parser.error(f"unknown soak actions {', '.join(unknown)} (choose from {', '.join(SoakHarness.ACTIONS)})")
+    
+    # Start the spectator stream if requested
+    spectator = None
+    if args.spectate_port is not None:
+        spectator = SpectatorStream(port=args.spectate_port)
+        spectator.start()
+    
+    move_cache = MoveCache(args.move_cache) if args.move_cache > 0 else None
+    move_log = MoveLogExporter(args.export_moves, archive=args.compress_moves) if args.export_moves else None
+    
+    if args.soak is not None:
+        harness = SoakHarness(frames=args.soak, script=script, seed=args.soak_seed,
+                              move_cache=move_cache, move_log=move_log, spectator=spectator)
+        sys.exit(0 if harness.run() else 1)
+    
     # Initialize the game UI
-    game_ui = GameUI()
+    game_ui = GameUI(spectator=spectator, move_cache=move_cache, move_log=move_log)
     
     # Run the game loop
     game_ui.run()
@@ -0,0 +1,923 @@
+import random
+import os
+import array
+from collections import OrderedDict
+
+class GameBinaryMerge:
+    MOVE_DIRECTIONS = ('up', 'down', 'left', 'right')
+    
+    def __init__(self, rows=2, cols=2, move_cache=None, move_log=None):
+        self.rows = rows
+        self.cols = cols
+        self.grid = [[0 for _ in range(cols)] for _ in range(rows)]
+        self.score = 0
+        self.best_score = 0
+        self.moves = 0
+        self.moves_before_spawn = 1  # Initial value
+        self.moves_since_last_spawn = 0
+        self.archipelago_checks = 0
+        self.location_thresholds = [4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072]  # Score thresholds for checks
+        self.claimed_thresholds = []
+        self.game_over = False
+        
+        # Optional MoveCache shared between games for repeated positions
+        self.move_cache = move_cache
+        
+        # Optional MoveLogExporter that receives one record per move
+        self.move_log = move_log
+        if self.move_log is not None:
+            self.move_log.start_game()
+        
+        # Define rewards structure
+        self.max_rows = 8
+        self.max_cols = 8
+        self.rewards = {
+            "add_row": False,
+            "add_column": False,
+            "delay_spawn_moves": False
+        }        
+       
+        # Add initial tiles
+        self.add_random_tile()
+        self.add_random_tile()
+    
+    def reset(self):
+        print("Resetting game...")
+        self.rows = 2
+        self.cols = 2
+        
+        # Make sure grid is properly initialized with the right dimensions
+        self.grid = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
+        print(f"Grid reset to {self.rows}x{self.cols}")
+        
+        self.score = 0
+        self.moves = 0
+        self.moves_since_last_spawn = 0
+        self.moves_before_spawn = 3
+        self.archipelago_checks = 0
+        self.claimed_thresholds = []
+        self.game_over = False
+        
+        # Don't reset best_score
+        print(f"Maintaining best score: {self.best_score}")
+        
+        # Reset rewards
+        self.max_rows = 8
+        self.max_cols = 8
+        self.rewards = {
+            "add_row": False,
+            "add_column": False,
+            "delay_spawn_moves": False
+        }
+        
+        # For testing - give player some checks to start with
+        # Comment this out for the real game
+        self.archipelago_checks = 3
+        
+        if self.move_log is not None:
+            self.move_log.start_game()
+        
+        # Add initial tiles
+        self.add_random_tile()
+        self.add_random_tile()
+        
+        print("Game reset complete")
+    
+    def add_random_tile(self):
+        # Make sure grid is properly initialized
+        if not self.grid or not self.grid[0]:
+            print("Warning: Grid not properly initialized")
+            self.grid = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
+            
+        position = self._place_random_tile()
+        if position is not None:
+            i, j = position
+            print(f"Added new tile at position ({i}, {j}) with value {self.grid[i][j]}")
+        else:
+            print("No empty cells available for new tile")
+    
+    def _place_random_tile(self):
+        # Returns the position of the new tile, or None if the grid is full
+        empty_cells = [(i, j) for i in range(self.rows) for j in range(self.cols) if self.grid[i][j] == 0]
+        if not empty_cells:
+            return None
+        i, j = random.choice(empty_cells)
+        self.grid[i][j] = 2 if random.random() < 0.9 else 4
+        return i, j
+    
+    def add_row(self):
+        if self.rows < self.max_rows:
+            self.grid.append([0 for _ in range(self.cols)])
+            self.rows += 1
+            print(f"Added row, grid now {self.rows}x{self.cols}")
+            return True
+        else:
+            print(f"Can't add row, already at maximum ({self.max_rows})")
+            return False
+    
+    def add_column(self):
+        if self.cols < self.max_cols:
+            for row in self.grid:
+                row.append(0)
+            self.cols += 1
+            print(f"Added column, grid now {self.rows}x{self.cols}")
+            return True
+        else:
+            print(f"Can't add column, already at maximum ({self.max_cols})")
+            return False
+    
+    def delay_spawn_moves(self):
+        if not self.rewards["delay_spawn_moves"]:
+            self.moves_before_spawn += 1
+            self.rewards["delay_spawn_moves"] = True
+            print(f"Reduced spawn moves to {self.moves_before_spawn}")
+            return True
+        return False
+    
+    def check_thresholds(self):
+        for threshold in self.location_thresholds:
+            if threshold not in self.claimed_thresholds and self.score >= threshold:
+                self.archipelago_checks += 1
+                self.claimed_thresholds.append(threshold)
+                print(f"Score threshold {threshold} reached! Checks: {self.archipelago_checks}")
+                
+    # Helper method for debugging
+    def debug_grid(self):
+        print("Current grid state:")
+        for row in self.grid:
+            print(row)
+    
+    def move(self, direction):
+        if self.game_over:
+            return False
+        
+        moved = False
+        
+        # Save the current state for comparison
+        old_grid = [row[:] for row in self.grid]
+        old_score = self.score
+        
+        try:
+            if self.move_cache is not None:
+                next_grid, points, moved = self.move_cache.get(self.grid, direction, self._slide)
+                if moved:
+                    self.grid = next_grid
+                    if points > self.score:
+                        self.score = points
+            elif direction == 'up':
+                moved = self._move_up()
+            elif direction == 'down':
+                moved = self._move_down()
+            elif direction == 'left':
+                moved = self._move_left()
+            elif direction == 'right':
+                moved = self._move_right()
+            
+            # Only count as a move if something changed
+            if moved:
+                self.moves += 1
+                self.moves_since_last_spawn += 1
+                
+                # Print move info
+                print(f"Moved {direction}, score: {self.score}, points gained: {self.score - old_score}")
+                
+                # Check if we need to spawn a new tile
+                if self.moves_since_last_spawn >= self.moves_before_spawn:
+                    self.add_random_tile()
+                    self.moves_since_last_spawn = 0
+                    print(f"New tile spawned after {self.moves_before_spawn} moves")
+                else:
+                    print(f"Next tile in {self.moves_before_spawn - self.moves_since_last_spawn} moves")
+                
+                # Check for new score thresholds
+                self.check_thresholds()
+                
+                # Update best score - add explicit debug
+                if self.score > self.best_score:
+                    old_best = self.best_score
+                    self.best_score = self.score
+                    print(f"New best score: {self.best_score} (was {old_best})")
+                
+                # Check if game is over
+                if self._is_grid_full() and not self._moves_available():
+                    self.game_over = True
+                    print("Game over!")
+                
+                if self.move_log is not None:
+                    self.move_log.record(self, direction, self.score - old_score)
+        
+        except Exception as e:
+            print(f"Error during movement: {e}")
+            import traceback
+            traceback.print_exc()
+            self.debug_grid()
+            # Recover from error - don't crash
+            return False
+            
+        return moved
+    
+    def apply_moves(self, sequence, checkpoint_every=None, record_states=False):
+        # Apply a whole sequence of actions in one tight loop: 'up', 'down', 'left',
+        # 'right', 'skip' and the reward names 'add_row', 'add_column', 'delay_spawn_moves'.
+        # Score thresholds and best score are only updated at the end, every
+        # checkpoint_every steps and before a reward claim (which needs up to date checks),
+        # or after every move while a move log is attached, so records match move().
+        # Stops early on game over and returns a summary dict.
+        sequence = list(sequence)
+        unknown = set(sequence) - set(self.MOVE_DIRECTIONS) - {'skip'} - set(self.rewards)
+        if unknown:
+            raise ValueError(f"Unknown actions in move sequence: {sorted(unknown)}")
+        
+        start_score = self.score
+        moved = 0
+        skipped = 0
+        claimed = 0
+        stopped_at = None
+        states = [] if record_states else None
+        
+        for step, action in enumerate(sequence):
+            if self.game_over:
+                stopped_at = step
+                break
+            
+            if action in self.MOVE_DIRECTIONS:
+                if self.move_cache is not None:
+                    next_grid, points, changed = self.move_cache.get(self.grid, action, self._slide)
+                else:
+                    next_grid, points, changed = self._slide(self.grid, action)
+                
+                if changed:
+                    old_score = self.score
+                    self.grid = next_grid
+                    if points > self.score:
+                        self.score = points
+                    self.moves += 1
+                    self.moves_since_last_spawn += 1
+                    moved += 1
+                    
+                    if self.moves_since_last_spawn >= self.moves_before_spawn:
+                        self._place_random_tile()
+                        self.moves_since_last_spawn = 0
+                        # Only a spawn can fill the grid, so only check for game over here.
+                        # Skips spawn too but, like skip_turn(), never end the game
+                        if self._is_grid_full() and not self._moves_available():
+                            self.game_over = True
+                    
+                    if self.move_log is not None:
+                        # Exported records carry the checks count, so keep it current
+                        # while logging, as move() does
+                        self._update_bookkeeping()
+                        self.move_log.record(self, action, self.score - old_score)
+            
+            elif action == 'skip':
+                self._place_random_tile()
+                self.moves_since_last_spawn = 0
+                skipped += 1
+                if self.move_log is not None:
+                    self.move_log.record(self, 'skip', 0)
+            
+            else:
+                self._update_bookkeeping()
+                if self._claim_reward(action):
+                    claimed += 1
+            
+            if record_states:
+                states.append(([row[:] for row in self.grid], self.score))
+            
+            if checkpoint_every and (step + 1) % checkpoint_every == 0:
+                self._update_bookkeeping()
+        
+        self._update_bookkeeping()
+        print(f"Applied {len(sequence) if stopped_at is None else stopped_at} actions: {moved} moves, "
+              f"{skipped} skips, {claimed} rewards, score: {self.score}")
+        if self.game_over:
+            print("Game over!")
+        
+        summary = {
+            "steps": len(sequence) if stopped_at is None else stopped_at,
+            "moved": moved,
+            "skipped": skipped,
+            "claimed": claimed,
+            "points": self.score - start_score,
+            "score": self.score,
+            "moves": self.moves,
+            "game_over": self.game_over,
+            "stopped_at": stopped_at
+        }
+        if record_states:
+            summary["states"] = states
+        return summary
+    
+    def _update_bookkeeping(self):
+        self.check_thresholds()
+        if self.score > self.best_score:
+            self.best_score = self.score
+    
+    def _claim_reward(self, reward):
+        # Spend a check on a reward, with the same rules as the UI buttons
+        if self.archipelago_checks <= 0:
+            return False
+        if reward == 'add_row':
+            claimed = self.rows < self.max_rows and self.add_row()
+        elif reward == 'add_column':
+            claimed = self.cols < self.max_cols and self.add_column()
+        else:
+            claimed = self.delay_spawn_moves()
+        if claimed:
+            self.archipelago_checks -= 1
+        return claimed
+    
+    def skip_turn(self):
+        self.add_random_tile()
+        self.moves_since_last_spawn = 0
+        print("Turn skipped, new tile added")
+        if self.move_log is not None:
+            self.move_log.record(self, 'skip', 0)
+        return True
+    
+    def _compress(self, grid):
+        try:
+            # Validate grid
+            if not grid or len(grid) == 0 or len(grid[0]) == 0:
+                print("Invalid grid dimensions in _compress")
+                return [[]]
+                
+            # Compress the grid (move all non-zero numbers to the left)
+            width = len(grid[0])
+            height = len(grid)
+            new_grid = []
+            
+            # Manually create the grid instead of using list comprehension
+            for _ in range(height):
+                row = []
+                for _ in range(width):
+                    row.append(0)
+                new_grid.append(row)
+                
+            # Move numbers to the left
+            for i in range(height):
+                pos = 0
+                for j in range(width):
+                    if grid[i][j] != 0:
+                        new_grid[i][pos] = grid[i][j]
+                        pos += 1
+            return new_grid
+            
+        except Exception as e:
+            print(f"Error compressing grid: {e}")
+            # Return original grid to avoid crashes
+            return grid
+    
+    def _merge(self, grid):
+        try:
+            # Merge adjacent equal numbers
+            score_added = 0
+            for i in range(len(grid)):
+                for j in range(len(grid[0])-1):
+                    if grid[i][j] == grid[i][j+1] and grid[i][j] != 0:
+                        grid[i][j] *= 2
+                        grid[i][j+1] = 0
+                        score_added += grid[i][j]
+            return grid, score_added
+        except Exception as e:
+            print(f"Error merging grid: {e}")
+            # Return original grid with 0 score to avoid crashes
+            return grid, 0
+    
+    def _reverse(self, grid):
+        try:
+            # Reverse the grid
+            new_grid = []
+            for i in range(len(grid)):
+                new_grid.append(grid[i][::-1])
+            return new_grid
+        except Exception as e:
+            print(f"Error reversing grid: {e}")
+            # Return original grid to avoid crashes
+            return grid.copy() if hasattr(grid, 'copy') else grid
+    
+    def _transpose(self, grid):
+        # Transpose the grid
+        # Handle empty grid case
+        if not grid or not grid[0]:
+            return []
+            
+        # Handle non-square grid case correctly
+        rows = len(grid)
+        cols = len(grid[0])
+        new_grid = [[0 for _ in range(rows)] for _ in range(cols)]
+        
+        for i in range(rows):
+            for j in range(cols):
+                new_grid[j][i] = grid[i][j]
+                
+        return new_grid
+    
+    def _slide(self, grid, direction):
+        # Same result as the _move_* methods, but without touching the game state.
+        # Works one line at a time in a single pass instead of going through
+        # _compress/_merge, since this is the hot path for the cache and apply_moves
+        # Returns (next_grid, points, changed)
+        if direction == 'left':
+            lines = grid
+        elif direction == 'right':
+            lines = [row[::-1] for row in grid]
+        elif direction == 'up':
+            lines = list(zip(*grid))
+        elif direction == 'down':
+            lines = [column[::-1] for column in zip(*grid)]
+        else:
+            return grid, 0, False
+        
+        points = 0
+        slid = []
+        for line in lines:
+            tiles = [value for value in line if value]
+            merged = []
+            i = 0
+            count = len(tiles)
+            while i < count:
+                value = tiles[i]
+                if i + 1 < count and tiles[i + 1] == value:
+                    value += value
+                    points += value
+                    i += 2
+                else:
+                    i += 1
+                merged.append(value)
+            merged.extend([0] * (len(line) - len(merged)))
+            slid.append(merged)
+        
+        # Undo the orientation change
+        if direction == 'right':
+            slid = [row[::-1] for row in slid]
+        elif direction == 'up':
+            slid = [list(row) for row in zip(*slid)]
+        elif direction == 'down':
+            slid = [list(row) for row in zip(*[line[::-1] for line in slid])]
+        
+        return slid, points, slid != grid
+    
+    def _move_left(self):
+        try:
+            # 1. Compress the grid
+            compressed_grid = self._compress(self.grid)
+            # 2. Merge the cells
+            merged_grid, new_score = self._merge(compressed_grid)
+            # 3. Compress again after merging
+            final_grid = self._compress(merged_grid)
+            
+            # Update the grid and score
+            changed = final_grid != self.grid
+            if changed:
+                self.grid = final_grid
+                if new_score > self.score:
+                    self.score = new_score
+            
+            return changed
+        except Exception as e:
+            print(f"Error in _move_left: {e}")
+            print(f"Grid dimensions: {len(self.grid)}x{len(self.grid[0]) if self.grid else 0}")
+            return False
+    
+    def _move_right(self):
+        try:
+            # 1. Reverse the grid
+            reversed_grid = self._reverse(self.grid)
+            # 2. Move left
+            compressed_grid = self._compress(reversed_grid)
+            merged_grid, new_score = self._merge(compressed_grid)
+            final_reversed_grid = self._compress(merged_grid)
+            # 3. Reverse back
+            final_grid = self._reverse(final_reversed_grid)
+            
+            # Update the grid and score
+            changed = final_grid != self.grid
+            if changed:
+                self.grid = final_grid
+                if new_score > self.score:
+                    self.score = new_score
+            
+            return changed
+        except Exception as e:
+            print(f"Error in _move_right: {e}")
+            print(f"Grid dimensions: {len(self.grid)}x{len(self.grid[0]) if self.grid else 0}")
+            return False
+    
+    def _move_up(self):
+        try:
+            # 1. Transpose the grid
+            transposed_grid = self._transpose(self.grid)
+            print(f"Transposed grid: {len(transposed_grid)}x{len(transposed_grid[0]) if transposed_grid else 0}")
+            
+            # 2. Move left
+            compressed_grid = self._compress(transposed_grid)
+            merged_grid, new_score = self._merge(compressed_grid)
+            final_transposed_grid = self._compress(merged_grid)
+            
+            # 3. Transpose back
+            final_grid = self._transpose(final_transposed_grid)
+            print(f"Final grid: {len(final_grid)}x{len(final_grid[0]) if final_grid else 0}")
+            
+            # Update the grid and score
+            changed = final_grid != self.grid
+            if changed:
+                self.grid = final_grid
+                if new_score > self.score:
+                    self.score = new_score
+            
+            return changed
+        except Exception as e:
+            print(f"Error in _move_up: {e}")
+            print(f"Grid dimensions: {len(self.grid)}x{len(self.grid[0]) if self.grid else 0}")
+            return False
+    
+    def _move_down(self):
+        try:
+            # 1. Transpose the grid
+            transposed_grid = self._transpose(self.grid)
+            
+            # 2. Move right
+            reversed_grid = self._reverse(transposed_grid)
+            compressed_grid = self._compress(reversed_grid)
+            merged_grid, new_score = self._merge(compressed_grid)
+            final_reversed_grid = self._compress(merged_grid)
+            final_transposed_grid = self._reverse(final_reversed_grid)
+            
+            # 3. Transpose back
+            final_grid = self._transpose(final_transposed_grid)
+            
+            # Update the grid and score
+            changed = final_grid != self.grid
+            if changed:
+                self.grid = final_grid
+                if new_score > self.score:
+                    self.score = new_score
+            
+            return changed
+        except Exception as e:
+            print(f"Error in _move_down: {e}")
+            print(f"Grid dimensions: {len(self.grid)}x{len(self.grid[0]) if self.grid else 0}")
+            return False
+    
+    def _is_grid_full(self):
+        try:
+            for row in self.grid:
+                if 0 in row:
+                    return False
+            return True
+        except Exception as e:
+            print(f"Error checking if grid is full: {e}")
+            return False
+    
+    def _moves_available(self):
+        try:
+            # Check if there are any possible moves
+            for i in range(self.rows):
+                for j in range(self.cols):
+                    if self.grid[i][j] == 0:
+                        return True
+                    
+                    # Check adjacent cells
+                    for di, dj in [(0, 1), (1, 0)]:
+                        ni, nj = i + di, j + dj
+                        if 0 <= ni < self.rows and 0 <= nj < self.cols:
+                            if self.grid[i][j] == self.grid[ni][nj]:
+                                return True
+            return False
+        except Exception as e:
+            print(f"Error checking if moves are available: {e}")
+            return True  # Assume moves are available if there's an error
+
+
+# Bounded LRU cache of move results keyed by whole-board position.
+# Boards are packed into an int (5 bits per cell, log2 of the tile) and reduced
+# to a canonical form under the symmetries the board shape allows: flips and
+# 180 degree rotation for any board, plus transposes and 90 degree rotations
+# for square boards. Equivalent positions share one entry.
+# Positions seen before in the same orientation are answered from a second LRU
+# keyed by the raw board, so canonicalising only costs anything on a miss there.
+# max_entries is the total across both tables: half goes to raw boards, the rest
+# to canonical ones.
+class MoveCache:
+    DIRECTION_VECTORS = {
+        'up': (-1, 0),
+        'down': (1, 0),
+        'left': (0, -1),
+        'right': (0, 1)
+    }
+    VECTOR_DIRECTIONS = {vector: direction for direction, vector in DIRECTION_VECTORS.items()}
+    
+    # Linear part of each symmetry as ((a, b), (c, d)): (i, j) -> (a*i + b*j, c*i + d*j)
+    SYMMETRIES = [
+        ((1, 0), (0, 1)),     # identity
+        ((-1, 0), (0, 1)),    # flip rows
+        ((1, 0), (0, -1)),    # flip columns
+        ((-1, 0), (0, -1))    # rotate 180
+    ]
+    SQUARE_SYMMETRIES = [
+        ((0, 1), (1, 0)),     # transpose
+        ((0, -1), (-1, 0)),   # anti-transpose
+        ((0, 1), (-1, 0)),    # rotate 90
+        ((0, -1), (1, 0))     # rotate 270
+    ]
+    
+    def __init__(self, max_entries=65536):
+        self.max_entries = max_entries
+        self.raw_limit = max_entries // 2
+        self.canonical_limit = max_entries - self.raw_limit
+        self.entries = OrderedDict()
+        self.raw_entries = OrderedDict()
+        self.transforms = {}
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    @property
+    def full(self):
+        return len(self.entries) >= self.canonical_limit and len(self.raw_entries) >= self.raw_limit
+    
+    def stats(self):
+        return (f"Move cache: {len(self.entries) + len(self.raw_entries)}/{self.max_entries} entries "
+                f"({len(self.entries)}/{self.canonical_limit} canonical, {len(self.raw_entries)}/{self.raw_limit} raw), "
+                f"{self.hits} hits, {self.misses} misses, hit rate {self.hit_rate:.1%}")
+    
+    def clear(self):
+        self.entries.clear()
+        self.raw_entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, grid, direction, compute):
+        # Returns (next_grid, points, changed), calling compute(grid, direction) on a miss
+        raw_key = (tuple(map(tuple, grid)), direction)
+        raw_entry = self.raw_entries.get(raw_key)
+        if raw_entry is not None:
+            self.hits += 1
+            self.raw_entries.move_to_end(raw_key)
+            next_rows, points, changed = raw_entry
+            return list(map(list, next_rows)), points, changed
+        
+        if direction not in self.DIRECTION_VECTORS:
+            return compute(grid, direction)
+        
+        rows = len(grid)
+        cols = len(grid[0])
+        cells = [value for row in grid for value in row]
+        
+        # Pick the transform giving the smallest packed board. Symmetric boards tie
+        # between transforms that map the direction differently, so break ties on
+        # the mapped direction to keep equivalent lookups on one key
+        best_key = None
+        for transform in self._transforms_for(rows, cols):
+            candidate = (self._pack([cells[source] for source in transform[0]]), transform[2][direction])
+            if best_key is None or candidate < best_key:
+                best_key = candidate
+                best_transform = transform
+        permutation, inverse, directions = best_transform
+        key = (rows, cols) + best_key
+        
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            canonical_next, points, changed = entry
+            # Map the stored board back to the caller's orientation
+            next_cells = [canonical_next[target] for target in inverse]
+            next_grid = [next_cells[i * cols:(i + 1) * cols] for i in range(rows)]
+            self._remember_raw(raw_key, next_grid, points, changed)
+            return next_grid, points, changed
+        
+        self.misses += 1
+        next_grid, points, changed = compute(grid, direction)
+        next_cells = [value for row in next_grid for value in row]
+        self.entries[key] = (tuple(next_cells[source] for source in permutation), points, changed)
+        if len(self.entries) > self.canonical_limit:
+            self.entries.popitem(last=False)
+        self._remember_raw(raw_key, next_grid, points, changed)
+        return next_grid, points, changed
+    
+    def _remember_raw(self, raw_key, next_grid, points, changed):
+        if self.raw_limit == 0:
+            return
+        self.raw_entries[raw_key] = (tuple(map(tuple, next_grid)), points, changed)
+        if len(self.raw_entries) > self.raw_limit:
+            self.raw_entries.popitem(last=False)
+    
+    def _pack(self, cells):
+        packed = 0
+        for value in cells:
+            packed = (packed << 5) | value.bit_length()
+        return packed
+    
+    def _transforms_for(self, rows, cols):
+        # Each transform is (permutation, inverse, directions) where
+        # transformed[t] = cells[permutation[t]] and cells[s] = transformed[inverse[s]]
+        transforms = self.transforms.get((rows, cols))
+        if transforms is not None:
+            return transforms
+        
+        symmetries = self.SYMMETRIES
+        if rows == cols:
+            symmetries = symmetries + self.SQUARE_SYMMETRIES
+        
+        transforms = []
+        for (a, b), (c, d) in symmetries:
+            # Offsets bring negative coordinates back into range
+            offset_i = (rows - 1 if a < 0 else 0) + (cols - 1 if b < 0 else 0)
+            offset_j = (rows - 1 if c < 0 else 0) + (cols - 1 if d < 0 else 0)
+            width = cols if d != 0 else rows
+            
+            permutation = [0] * (rows * cols)
+            inverse = [0] * (rows * cols)
+            for i in range(rows):
+                for j in range(cols):
+                    target = (a * i + b * j + offset_i) * width + (c * i + d * j + offset_j)
+                    permutation[target] = i * cols + j
+                    inverse[i * cols + j] = target
+            
+            directions = {}
+            for direction, (di, dj) in self.DIRECTION_VECTORS.items():
+                directions[direction] = self.VECTOR_DIRECTIONS[(a * di + b * dj, c * di + d * dj)]
+            
+            transforms.append((permutation, inverse, directions))
+        
+        self.transforms[(rows, cols)] = transforms
+        return transforms
+
+
+# Columnar export of per-move records for offline analysis.
+# Records are buffered per column and written in chunks of chunk_size rows. By
+# default each chunk is a directory of one .npy file per column
+# (moves-00000/game.npy, ...), which the query helpers memory-map. With
+# archive=True chunks are written as a compressed archive instead
+# (moves-00000.npz), smaller on disk but decompressed on every read.
+# NumPy is only needed when an exporter is actually used.
+class MoveLogExporter:
+    DIRECTION_CODES = {'up': 0, 'down': 1, 'left': 2, 'right': 3, 'skip': 4}
+    
+    # Column name, array typecode, numpy dtype
+    COLUMNS = [
+        ("game", "I", "uint32"),
+        ("move", "I", "uint32"),
+        ("direction", "B", "uint8"),
+        ("score_delta", "i", "int32"),
+        ("empty_cells", "B", "uint8"),
+        ("max_tile", "I", "uint32"),
+        ("rows", "B", "uint8"),
+        ("cols", "B", "uint8"),
+        ("checks", "H", "uint16"),
+        ("game_over", "B", "bool")
+    ]
+    
+    def __init__(self, directory, chunk_size=65536, archive=False):
+        import numpy  # Fail early if the optional dependency is missing
+        
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.archive = archive
+        os.makedirs(directory, exist_ok=True)
+        
+        # Continue numbering after any chunks already in the directory
+        chunks = move_log_chunks(directory)
+        self.next_chunk = _chunk_index(chunks[-1]) + 1 if chunks else 0
+        self.game = -1
+        if chunks:
+            self.game = int(_load_chunk(chunks[-1], ["game"])["game"].max())
+        
+        self.buffers = {name: array.array(typecode) for name, typecode, _ in self.COLUMNS}
+        self.game_moves = 0
+    
+    def start_game(self):
+        self.game += 1
+        self.game_moves = 0
+    
+    def record(self, game, direction, score_delta):
+        empty_cells = 0
+        max_tile = 0
+        for row in game.grid:
+            empty_cells += row.count(0)
+            row_max = max(row)
+            if row_max > max_tile:
+                max_tile = row_max
+        
+        self.game_moves += 1
+        buffers = self.buffers
+        buffers["game"].append(self.game)
+        buffers["move"].append(self.game_moves)
+        buffers["direction"].append(self.DIRECTION_CODES[direction])
+        buffers["score_delta"].append(score_delta)
+        buffers["empty_cells"].append(empty_cells)
+        buffers["max_tile"].append(max_tile)
+        buffers["rows"].append(game.rows)
+        buffers["cols"].append(game.cols)
+        buffers["checks"].append(game.archipelago_checks)
+        buffers["game_over"].append(1 if game.game_over else 0)
+        
+        if len(buffers["game"]) >= self.chunk_size:
+            self.flush()
+    
+    def flush(self):
+        import numpy
+        
+        if not self.buffers["game"]:
+            return
+        
+        path = os.path.join(self.directory, f"moves-{self.next_chunk:05d}")
+        columns = {}
+        for name, typecode, dtype in self.COLUMNS:
+            columns[name] = numpy.frombuffer(self.buffers[name], dtype=typecode).astype(dtype)
+        
+        if self.archive:
+            path += ".npz"
+            numpy.savez_compressed(path, **columns)
+        else:
+            os.makedirs(path, exist_ok=True)
+            for name, values in columns.items():
+                numpy.save(os.path.join(path, f"{name}.npy"), values)
+        print(f"Wrote {len(columns['game'])} move records to {path}")
+        
+        self.next_chunk += 1
+        self.buffers = {name: array.array(typecode) for name, typecode, _ in self.COLUMNS}
+    
+    def close(self):
+        self.flush()
+
+
+def move_log_chunks(directory):
+    # Chunk paths without extension, from chunk directories and/or archives,
+    # in chunk number order
+    names = set()
+    for name in os.listdir(directory):
+        if name.startswith("moves-"):
+            if name.endswith(".npz"):
+                name = name[:-len(".npz")]
+            elif not os.path.isdir(os.path.join(directory, name)):
+                continue
+            if name[len("moves-"):].isdigit():
+                names.add(name)
+    return [os.path.join(directory, name) for name in sorted(names, key=_chunk_index)]
+
+
+def _chunk_index(path):
+    return int(os.path.basename(path)[len("moves-"):])
+
+
+def _check_move_log_columns(columns):
+    known = [name for name, _, _ in MoveLogExporter.COLUMNS]
+    if columns is None:
+        return known
+    unknown = [name for name in columns if name not in known]
+    if unknown:
+        raise ValueError(f"Unknown move log columns {unknown}, expected some of {known}")
+    return list(columns)
+
+
+def _load_chunk(path, columns):
+    # Memory-map the per-column .npy files, or decompress from the archive for
+    # chunks written with archive=True
+    import numpy
+    
+    if os.path.isdir(path):
+        return {name: numpy.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in columns}
+    with numpy.load(path + ".npz") as archive:
+        return {name: archive[name] for name in columns}
+
+
+def iter_move_log(directory, columns=None, where=None):
+    # Yield one dict of column arrays per chunk, so callers never have to hold
+    # the whole log in memory. where(chunk) can return a boolean mask to keep
+    # only matching rows; it sees the requested columns
+    columns = _check_move_log_columns(columns)
+    for path in move_log_chunks(directory):
+        chunk = _load_chunk(path, columns)
+        if where is not None:
+            mask = where(chunk)
+            chunk = {name: values[mask] for name, values in chunk.items()}
+        yield chunk
+
+
+def load_move_log(directory, columns=None, where=None):
+    # Concatenate the (optionally filtered) requested columns of every chunk.
+    # For very large logs prefer iter_move_log, or a where filter, so only the
+    # rows of interest end up in memory
+    import numpy
+    
+    columns = _check_move_log_columns(columns)
+    parts = {name: [] for name in columns}
+    for chunk in iter_move_log(directory, columns, where):
+        for name in columns:
+            parts[name].append(chunk[name])
+    
+    result = {}
+    for name, _, dtype in MoveLogExporter.COLUMNS:
+        if name in parts:
+            if parts[name]:
+                result[name] = numpy.concatenate(parts[name])
+            else:
+                result[name] = numpy.empty(0, dtype=dtype)
+    return result
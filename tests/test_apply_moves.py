@@ -0,0 +1,85 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+from binary_merge_engine import GameBinaryMerge, MoveLogExporter, load_move_log
+
+DIRECTIONS = ['up', 'down', 'left', 'right']
+
+
+def random_sequence(seed, length):
+    rnd = random.Random(seed)
+    return [rnd.choice(DIRECTIONS + ['skip']) for _ in range(length)]
+
+
+def play_one_by_one(game, sequence):
+    for action in sequence:
+        if game.game_over:
+            break
+        if action == 'skip':
+            game.skip_turn()
+        else:
+            game.move(action)
+
+
+def test_slide_matches_move_methods():
+    rnd = random.Random(32)
+    game = GameBinaryMerge()
+    for rows, cols in [(2, 2), (2, 3), (3, 2), (4, 4), (3, 5), (8, 8)]:
+        for _ in range(200):
+            grid = [[rnd.choice([0, 0, 2, 4, 8]) for _ in range(cols)] for _ in range(rows)]
+            for direction in DIRECTIONS:
+                game.rows, game.cols = rows, cols
+                game.grid = [row[:] for row in grid]
+                game.score = 0
+                changed = getattr(game, '_move_' + direction)()
+                next_grid, points, slid_changed = game._slide(grid, direction)
+                assert (next_grid, slid_changed) == (game.grid, changed)
+                assert points == game.score
+
+
+def test_apply_moves_matches_move():
+    for seed in range(100):
+        sequence = random_sequence(seed, 60)
+
+        random.seed(seed)
+        expected = GameBinaryMerge(3, 3)
+        random.seed(seed + 1000)
+        play_one_by_one(expected, sequence)
+
+        random.seed(seed)
+        game = GameBinaryMerge(3, 3)
+        random.seed(seed + 1000)
+        game.apply_moves(sequence)
+
+        assert game.grid == expected.grid
+        assert (game.score, game.best_score, game.moves) == (expected.score, expected.best_score, expected.moves)
+        assert (game.archipelago_checks, game.game_over) == (expected.archipelago_checks, expected.game_over)
+
+
+def test_apply_moves_logs_same_records_as_move():
+    directory = tempfile.mkdtemp()
+    try:
+        logs = []
+        for name in ("move", "apply"):
+            path = os.path.join(directory, name)
+            log = MoveLogExporter(path, archive=False)
+            random.seed(5)
+            game = GameBinaryMerge(3, 3, move_log=log)
+            random.seed(6)
+            sequence = random_sequence(7, 200)
+            if name == "move":
+                play_one_by_one(game, sequence)
+            else:
+                game.apply_moves(sequence)
+            log.close()
+            logs.append(load_move_log(path))
+
+        for column in logs[0]:
+            assert list(logs[0][column]) == list(logs[1][column]), column
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,63 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+from binary_merge_engine import GameBinaryMerge, MoveCache
+
+DIRECTIONS = ['up', 'down', 'left', 'right']
+SHAPES = [(2, 2), (2, 3), (3, 2), (3, 3), (4, 4), (2, 5), (5, 3), (8, 8)]
+
+
+def random_grid(rnd, rows, cols):
+    return [[rnd.choice([0, 0, 2, 4, 8, 16]) for _ in range(cols)] for _ in range(rows)]
+
+
+def test_cached_results_match_uncached():
+    rnd = random.Random(27)
+    game = GameBinaryMerge()
+    cache = MoveCache(max_entries=1000)
+    for rows, cols in SHAPES:
+        for _ in range(300):
+            grid = random_grid(rnd, rows, cols)
+            for direction in DIRECTIONS:
+                expected = game._slide(grid, direction)
+                assert cache.get([row[:] for row in grid], direction, game._slide) == expected
+                # Second lookup comes from the raw-board entry
+                assert cache.get([row[:] for row in grid], direction, game._slide) == expected
+
+
+def test_symmetric_boards_share_entries():
+    rnd = random.Random(28)
+    game = GameBinaryMerge()
+    for rows, cols in SHAPES:
+        for _ in range(50):
+            grid = random_grid(rnd, rows, cols)
+            variants = [
+                (grid, {d: d for d in DIRECTIONS}),
+                ([row[::-1] for row in grid], {'up': 'up', 'down': 'down', 'left': 'right', 'right': 'left'}),
+                (grid[::-1], {'up': 'down', 'down': 'up', 'left': 'left', 'right': 'right'}),
+            ]
+            if rows == cols:
+                variants.append(([list(col) for col in zip(*grid)], {'up': 'left', 'down': 'right', 'left': 'up', 'right': 'down'}))
+
+            for direction in DIRECTIONS:
+                cache = MoveCache()
+                cache.get(grid, direction, game._slide)
+                for variant, mapping in variants[1:]:
+                    result = cache.get(variant, mapping[direction], game._slide)
+                    assert result == game._slide(variant, mapping[direction])
+                assert cache.misses == 1
+                assert cache.hits == len(variants) - 1
+
+
+def test_total_entries_stay_within_max_entries():
+    rnd = random.Random(29)
+    game = GameBinaryMerge()
+    cache = MoveCache(max_entries=101)
+    for _ in range(2000):
+        grid = random_grid(rnd, 3, 3)
+        cache.get(grid, rnd.choice(DIRECTIONS), game._slide)
+        assert len(cache.entries) + len(cache.raw_entries) <= 101
+    assert cache.full
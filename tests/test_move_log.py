@@ -0,0 +1,51 @@
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+from binary_merge_engine import GameBinaryMerge, MoveLogExporter, load_move_log
+
+
+def write_games(directory, games, moves_per_game=5):
+    # One chunk per game, so chunk numbers line up with games
+    log = MoveLogExporter(directory, chunk_size=moves_per_game)
+    game = GameBinaryMerge(4, 4, move_log=log)
+    for index in range(games):
+        if index:
+            game.reset()
+        for _ in range(moves_per_game):
+            log.record(game, 'skip', 0)
+    log.close()
+
+
+def test_resume_after_gap_keeps_existing_chunks():
+    directory = tempfile.mkdtemp()
+    try:
+        write_games(directory, 3)
+        shutil.rmtree(os.path.join(directory, "moves-00000"))
+        before = list(load_move_log(directory, ["game"])["game"])
+        assert before == [1] * 5 + [2] * 5
+
+        write_games(directory, 1)
+        after = list(load_move_log(directory, ["game"])["game"])
+        assert after == before + [3] * 5
+        assert os.path.isdir(os.path.join(directory, "moves-00003"))
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_archive_writes_only_compressed_chunks():
+    directory = tempfile.mkdtemp()
+    try:
+        log = MoveLogExporter(directory, chunk_size=3, archive=True)
+        game = GameBinaryMerge(3, 3, move_log=log)
+        for _ in range(7):
+            log.record(game, 'skip', 0)
+        log.close()
+
+        assert sorted(os.listdir(directory)) == ["moves-00000.npz", "moves-00001.npz", "moves-00002.npz"]
+        assert len(load_move_log(directory, ["move"])["move"]) == 7
+    finally:
+        shutil.rmtree(directory)